@@ -0,0 +1,122 @@
+import os
+import numpy as np
+from data_extraction import load_data, parse_filename, compute_average_and_ci, per_run_metrics
+from queueing_model import load_ini_parameters, expected_task_bytes
+
+# Stimatore a variabili di controllo: Y_cv = Y - beta (C - E[C]), con beta
+# stimato per minimi quadrati sulle run. Le variabili di controllo sono
+# quantita' di input con valore atteso noto dai parametri del file: arrivi
+# osservati e dimensione media dei task, entrambi ricostruiti dai vettori.
+
+CV_METRICS = ("responseTime", "queueLength", "dropped")
+
+def _vector_values(run_content, key):
+    return [vector.get("value", []) for vector in run_content.get("vectors", []) if vector.get("name") == key]
+
+def observed_arrivals(data):
+    # Arrivi per run ricostruiti dai risultati: task serviti (un campione di
+    # responseTime per task), task scartati e task ancora in coda a fine run
+    arrivals = []
+    for run_name, run_content in data.items():
+        served = sum(len(values) for values in _vector_values(run_content, "responseTime:vector"))
+        in_queue = sum(values[-1] for values in _vector_values(run_content, "queueLength:vector") if len(values) > 0)
+        dropped = sum(s.get("value") or 0 for s in run_content.get("scalars", []) if s.get("name") == "dropped:count")
+        arrivals.append(served + dropped + in_queue)
+    return np.array(arrivals, dtype=float)
+
+def observed_mean_size(data, service_rate):
+    # Dimensione media dei task (byte) ricostruita dai vettori: responseTime e'
+    # emesso all'inizio del servizio; se dopo il prelievo la coda non e' vuota
+    # (record di queueLength allo stesso istante con valore >= 1) il task
+    # successivo parte esattamente a fine servizio, quindi s_i = t_{i+1} - t_i.
+    # La condizione dipende solo dagli arrivi precedenti, non dalla dimensione.
+    observed = []
+    for run_name, run_content in data.items():
+        by_module = {}
+        for vector in run_content.get("vectors", []):
+            by_module.setdefault(vector.get("module", ""), {})[vector.get("name")] = vector
+        sizes = []
+        for vecs in by_module.values():
+            if "responseTime:vector" not in vecs or "queueLength:vector" not in vecs:
+                continue
+            starts = np.asarray(vecs["responseTime:vector"].get("time", []), dtype=float)
+            ql_times = np.asarray(vecs["queueLength:vector"].get("time", []), dtype=float)
+            ql_values = np.asarray(vecs["queueLength:vector"].get("value", []), dtype=float)
+            if len(starts) < 2 or len(ql_times) == 0:
+                continue
+            # Ultimo record di queueLength a ogni istante di inizio servizio
+            idx = np.searchsorted(ql_times, starts[:-1], side="right") - 1
+            found = idx >= 0
+            busy = np.zeros(len(starts) - 1, dtype=bool)
+            busy[found] = (ql_times[idx[found]] == starts[:-1][found]) & (ql_values[idx[found]] >= 1)
+            sizes.append(np.round(np.diff(starts)[busy] * service_rate))
+        sizes = np.concatenate(sizes) if sizes else np.array([])
+        observed.append(sizes.mean() if len(sizes) else np.nan)
+    return np.array(observed, dtype=float)
+
+def expected_arrivals(params, ini_params=None):
+    if ini_params is None:
+        ini_params = load_ini_parameters()
+    # Ogni utente e' un processo di Poisson di tasso 1/interarrival
+    return params["n_users"] / params["interarrival"] * ini_params["sim-time-limit"]
+
+def control_variate_estimate(y, controls, control_means, z=1.96):
+    y = np.asarray(y, dtype=float)
+    c = np.asarray(controls, dtype=float).reshape(len(y), -1)
+    mu = np.asarray(control_means, dtype=float).reshape(-1)
+    n, k = c.shape
+    if n <= k + 1:
+        mean, margin, ci_low, ci_high = compute_average_and_ci(y)
+        return {"mean": mean, "margin": margin, "ci_low": ci_low, "ci_high": ci_high, "beta": np.zeros(k)}
+
+    centered = c - c.mean(axis=0)
+    beta, *_ = np.linalg.lstsq(centered, y - y.mean(), rcond=None)
+    adjusted = y - (c - mu) @ beta
+    mean = adjusted.mean()
+    # k gradi di liberta' persi per la stima di beta
+    residuals = adjusted - mean
+    std = np.sqrt(residuals @ residuals / (n - 1 - k))
+    margin = z * std / np.sqrt(n)
+    return {"mean": mean, "margin": margin, "ci_low": mean - margin, "ci_high": mean + margin, "beta": beta}
+
+def control_variate_statistics(data, file_name, metrics=CV_METRICS, size_control=True, ini_params=None):
+    params = parse_filename(file_name)
+    per_run = per_run_metrics(data)
+    if ini_params is None:
+        ini_params = load_ini_parameters()
+
+    controls = [observed_arrivals(data)]
+    control_means = [expected_arrivals(params, ini_params)]
+    if size_control:
+        size = observed_mean_size(data, ini_params["serviceRate"])
+        if not np.any(np.isnan(size)):
+            controls.append(size)
+            control_means.append(expected_task_bytes(float(params["size_rate"])))
+    controls = np.column_stack(controls)
+
+    results = {}
+    for metric in metrics:
+        y = per_run[metric]
+        mean, margin, ci_low, ci_high = compute_average_and_ci(y)
+        results[metric] = {
+            "plain": {"mean": mean, "margin": margin, "ci_low": ci_low, "ci_high": ci_high},
+            "cv": control_variate_estimate(y, controls, control_means),
+        }
+    return results
+
+def print_control_variate_statistics(results):
+    print("\n=== Control-variate estimates ===")
+    for metric, r in results.items():
+        plain, cv = r["plain"], r["cv"]
+        reduction = 1 - (cv["margin"] / plain["margin"]) ** 2 if plain["margin"] > 0 else 0.0
+        print(f"{metric}: plain mean = {plain['mean']:.2f} +/- {plain['margin']:.2f}, "
+              f"CV mean = {cv['mean']:.2f} +/- {cv['margin']:.2f} (variance reduction {reduction:.0%})")
+    print()
+
+
+if __name__ == "__main__":
+    file_name = "Lognormal_A_N250_I05_S1e3.json"
+
+    data = load_data(os.path.join("data", file_name))
+    results = control_variate_statistics(data, file_name)
+    print_control_variate_statistics(results)
@@ -1,11 +1,112 @@
 import os
+import re
 import json
 import numpy as np
 from collections import defaultdict
 
-def load_data(json_path):
+# Backend di decodifica per load_data:
+#   "json"   - json della libreria standard (liste di float Python)
+#   "numpy"  - gli array "time"/"value" vengono letti direttamente in buffer
+#              float64 con np.fromstring, il resto del file con json: stessa
+#              velocita' di "json" ma senza un oggetto float per campione
+#   "orjson" - tutto il file con orjson, poi un np.asarray per array: il piu'
+#              veloce, ma crea comunque un float Python per campione (picco di
+#              memoria superiore a "json"); solo su richiesta esplicita
+#   "auto"   - "numpy", il backend senza oggetti per campione
+JSON_BACKENDS = ("json", "numpy", "orjson", "auto")
+
+_ARRAY_RE = re.compile(r'"(?:time|value)"\s*:\s*\[')
+_PLACEHOLDER = "\x00array:"
+
+def _parse_number_array(text):
+    if not text.strip():
+        return np.empty(0)
+    arr = np.fromstring(text, dtype=np.float64, sep=",")
+    if len(arr) != text.count(",") + 1:
+        raise ValueError("Array non numerico nel file JSON.")
+    return arr
+
+def _replace_placeholders(node, arrays):
+    if isinstance(node, dict):
+        for k, v in node.items():
+            if isinstance(v, str) and v.startswith(_PLACEHOLDER):
+                node[k] = arrays[int(v[len(_PLACEHOLDER):])]
+            elif isinstance(v, (dict, list)):
+                _replace_placeholders(v, arrays)
+    elif isinstance(node, list):
+        for v in node:
+            if isinstance(v, (dict, list)):
+                _replace_placeholders(v, arrays)
+
+def _loads_numpy(raw):
+    # Gli array numerici vengono sostituiti da segnaposto: il parser JSON vede
+    # solo lo scheletro (run, moduli, scalari) e non crea un float per campione
+    pieces = []
+    arrays = []
+    pos = 0
+    for match in _ARRAY_RE.finditer(raw):
+        if match.start() < pos:
+            continue
+        end = raw.index("]", match.end())
+        arrays.append(_parse_number_array(raw[match.end():end]))
+        pieces.append(raw[pos:match.end() - 1])
+        pieces.append('"\\u0000array:%d"' % (len(arrays) - 1))
+        pos = end + 1
+    pieces.append(raw[pos:])
+    data = json.loads("".join(pieces))
+    _replace_placeholders(data, arrays)
+    return data
+
+def _orjson_loads():
+    try:
+        import orjson
+        return orjson.loads
+    except ImportError:
+        return None
+
+def _vectors_to_arrays(data):
+    for run_content in data.values():
+        for vector in run_content.get("vectors", []):
+            try:
+                times = np.asarray(vector.get("time", []), dtype=float)
+                values = np.asarray(vector.get("value", []), dtype=float)
+            except (TypeError, ValueError):
+                # Array non numerici: restano liste, come con "json"
+                continue
+            vector["time"] = times
+            vector["value"] = values
+    return data
+
+def load_data(json_path, backend="json"):
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"Backend non valido. Usa uno tra {JSON_BACKENDS}.")
+    if backend == "orjson":
+        orjson_loads = _orjson_loads()
+        if orjson_loads is None:
+            raise ImportError("Il backend 'orjson' richiede il pacchetto orjson.")
+        with open(json_path, 'rb') as f:
+            raw = f.read()
+        try:
+            return _vectors_to_arrays(orjson_loads(raw))
+        except ValueError:
+            # orjson rifiuta NaN/Infinity (ammessi da json): percorso "numpy"
+            pass
+
     with open(json_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+        if backend == "json":
+            return json.load(f)
+        raw = f.read()
+    try:
+        return _loads_numpy(raw)
+    except ValueError:
+        # Array non numerici o JSON inatteso: decodifica standard
+        return json.loads(raw)
+
+def _take(times, values, indices):
+    # Con i backend NumPy gli array sono gia' ndarray: indicizzazione vettoriale
+    if isinstance(times, np.ndarray) and isinstance(values, np.ndarray):
+        return times[indices], values[indices]
+    return [times[i] for i in indices], [values[i] for i in indices]
 
 def extract_statistics(data, subsample_rate=None, subsample_number=None):
     scalars = defaultdict(lambda: defaultdict(list))
@@ -29,16 +130,14 @@ def extract_statistics(data, subsample_rate=None, subsample_number=None):
                 n_keep = min(subsample_number, n_total)
                 if n_keep > 1:
                     indices = np.linspace(0, n_total - 1, n_keep, dtype=int)
-                    times = [times[i] for i in indices]
-                    values = [values[i] for i in indices]
+                    times, values = _take(times, values, indices)
             elif subsample_rate is not None and subsample_rate > 0:
                 n_total = len(times)
                 discard_fraction = min(subsample_rate / 100.0, 1.0)
                 keep_fraction = 1.0 - discard_fraction
                 n_keep = int(max(1, np.floor(n_total * keep_fraction)))
                 indices = np.linspace(0, n_total - 1, n_keep, dtype=int)
-                times = [times[i] for i in indices]
-                values = [values[i] for i in indices]
+                times, values = _take(times, values, indices)
 
             vectors[module][name].append((times, values))
 
@@ -75,27 +174,160 @@ def compute_averages_with_ci(scalars, key):
             }
     return results
 
-def compute_mean_time_series(vectors, key, convert_to_ms=False):
-    mean_series = {}
+def _concat_vector_values(run_content, key):
+    values = [np.asarray(vector.get("value", []), dtype=float)
+              for vector in run_content.get("vectors", []) if vector.get("name") == key]
+    return np.concatenate(values) if values else np.array([])
+
+def per_run_metrics(data):
+    # Un valore per ripetizione: media dei vettori su tutte le base station
+    # (response time in ms) e totale degli scalari di conteggio
+    metrics = {"responseTime": [], "queueLength": [], "dropped": [], "forwarded": []}
+    for run_name, run_content in data.items():
+        rt_values = _concat_vector_values(run_content, "responseTime:vector")
+        ql_values = _concat_vector_values(run_content, "queueLength:vector")
+        metrics["responseTime"].append(rt_values.mean() * 1000 if len(rt_values) else 0.0)
+        metrics["queueLength"].append(ql_values.mean() if len(ql_values) else 0.0)
+
+        dropped = 0
+        forwarded = 0
+        for scalar in run_content.get("scalars", []):
+            value = scalar.get("value") if scalar.get("value") is not None else 0
+            if scalar.get("name") == "dropped:count":
+                dropped += value
+            elif scalar.get("name") == "forwarded:count":
+                forwarded += value
+        metrics["dropped"].append(dropped)
+        metrics["forwarded"].append(forwarded)
+    return metrics
+
+# Quantili t di Student (bilaterali) per dof = 1..30, usati senza scipy
+T_TABLE = {
+    0.95: (12.7062, 4.3027, 3.1824, 2.7764, 2.5706, 2.4469, 2.3646, 2.3060, 2.2622, 2.2281,
+           2.2010, 2.1788, 2.1604, 2.1448, 2.1314, 2.1199, 2.1098, 2.1009, 2.0930, 2.0860,
+           2.0796, 2.0739, 2.0687, 2.0639, 2.0595, 2.0555, 2.0518, 2.0484, 2.0452, 2.0423),
+    0.99: (63.6567, 9.9248, 5.8409, 4.6041, 4.0321, 3.7074, 3.4995, 3.3554, 3.2498, 3.1693,
+           3.1058, 3.0545, 3.0123, 2.9768, 2.9467, 2.9208, 2.8982, 2.8784, 2.8609, 2.8453,
+           2.8314, 2.8188, 2.8073, 2.7969, 2.7874, 2.7787, 2.7707, 2.7633, 2.7564, 2.7500),
+}
+
+def student_t_quantile(confidence, dof):
+    p = 0.5 + confidence / 2.0
+    try:
+        from scipy.stats import t
+        return float(t.ppf(p, dof))
+    except ImportError:
+        pass
+    if confidence in T_TABLE and dof <= len(T_TABLE[confidence]):
+        return T_TABLE[confidence][dof - 1]
+    # Forme chiuse esatte per dof = 1 (Cauchy) e dof = 2
+    if dof == 1:
+        return float(np.tan(np.pi * (p - 0.5)))
+    if dof == 2:
+        return (2 * p - 1) / np.sqrt(2 * p * (1 - p))
+    # Espansione di Cornish-Fisher attorno al quantile normale: per dof >= 3
+    # l'errore e' sotto lo 0.8% al 95% (3.4% al 99%, coperto dalla tabella)
+    from statistics import NormalDist
+    z = NormalDist().inv_cdf(p)
+    g1 = (z ** 3 + z) / 4.0
+    g2 = (5 * z ** 5 + 16 * z ** 3 + 3 * z) / 96.0
+    g3 = (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / 384.0
+    return z + g1 / dof + g2 / dof ** 2 + g3 / dof ** 3
+
+def build_replication_matrix(vectors, key, convert_to_ms=False):
+    # Per ogni modulo: griglia temporale comune e matrice (repliche x tempi),
+    # con una sola interpolazione per run
+    matrices = {}
     for module, metrics in vectors.items():
         if key in metrics:
             series_list = metrics[key]
-            all_times = np.unique(np.concatenate([np.array(times) for times, _ in series_list]))
-            time_to_values = {t: [] for t in all_times}
-            for times, values in series_list:
-                interp_values = np.interp(all_times, times, values)
-                for t, v in zip(all_times, interp_values):
-                    time_to_values[t].append(v)
-            mean_times = []
-            mean_values = []
-            for t in all_times:
-                if time_to_values[t]:
-                    mean_times.append(t)
-                    m_val = np.mean(time_to_values[t])
-                    if convert_to_ms:
-                        m_val *= 1000
-                    mean_values.append(m_val)
-            mean_series[module] = (mean_times, mean_values)
+            all_times = np.unique(np.concatenate([np.asarray(times, dtype=float) for times, _ in series_list]))
+            matrix = np.empty((len(series_list), len(all_times)))
+            for i, (times, values) in enumerate(series_list):
+                matrix[i] = np.interp(all_times, times, values)
+            if convert_to_ms:
+                matrix *= 1000
+            matrices[module] = (all_times, matrix)
+    return matrices
+
+def compute_ensemble_bands(all_times, matrix, confidence=0.95, quantiles=(0.05, 0.95)):
+    n = matrix.shape[0]
+    mean = matrix.mean(axis=0)
+    if n > 1:
+        std = matrix.std(axis=0, ddof=1)
+        margin = student_t_quantile(confidence, n - 1) * std / np.sqrt(n)
+    else:
+        margin = np.zeros_like(mean)
+    q_low, q_high = np.quantile(matrix, quantiles, axis=0)
+    return {
+        "times": all_times,
+        "mean": mean,
+        "margin": margin,
+        "ci_low": mean - margin,
+        "ci_high": mean + margin,
+        "q_low": q_low,
+        "q_high": q_high,
+    }
+
+def compute_ensemble_time_series(vectors, key, convert_to_ms=False, confidence=0.95, quantiles=(0.05, 0.95)):
+    bands = {}
+    for module, (all_times, matrix) in build_replication_matrix(vectors, key, convert_to_ms).items():
+        bands[module] = compute_ensemble_bands(all_times, matrix, confidence, quantiles)
+    return bands
+
+def bands_to_mean_series(bands):
+    return {module: (b["times"], b["mean"]) for module, b in bands.items()}
+
+def grid_chunks(n, workers, min_chunk=256):
+    # Suddivisione della griglia temporale in blocchi contigui per i thread
+    n_chunks = max(1, min(workers or 1, n // min_chunk))
+    bounds = np.linspace(0, n, n_chunks + 1).astype(int)
+    return [slice(a, b) for a, b in zip(bounds[:-1], bounds[1:])]
+
+def run_chunked(tasks, workers):
+    # tasks: lista di callable senza argomenti. np.interp e le ufunc rilasciano
+    # il GIL, quindi i thread lavorano davvero in parallelo; l'ordine delle
+    # somme per ogni punto non cambia, per cui il risultato e' identico al seriale
+    if not workers or workers <= 1:
+        return [task() for task in tasks]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(task) for task in tasks]
+        return [f.result() for f in futures]
+
+def as_float_series(series_list):
+    # Conversione una sola volta, prima di creare i task: nei blocchi arrivano
+    # solo array float64 (niente np.asarray col GIL preso per ogni blocco)
+    return [(np.asarray(times, dtype=float), np.asarray(values, dtype=float)) for times, values in series_list]
+
+def _interp_mean(series_list, grid):
+    acc = np.interp(grid, series_list[0][0], series_list[0][1])
+    for times, values in series_list[1:]:
+        acc += np.interp(grid, times, values)
+    return acc / len(series_list)
+
+def compute_mean_time_series(vectors, key, convert_to_ms=False, workers=None):
+    modules = [module for module, metrics in vectors.items() if key in metrics]
+    series = {module: as_float_series(vectors[module][key]) for module in modules}
+    grids = run_chunked(
+        [lambda s=series[m]: np.unique(np.concatenate([times for times, _ in s])) for m in modules],
+        workers,
+    )
+
+    tasks = []
+    owners = []
+    for module, all_times in zip(modules, grids):
+        for chunk in grid_chunks(len(all_times), workers):
+            tasks.append(lambda s=series[module], g=all_times[chunk]: _interp_mean(s, g))
+            owners.append(module)
+    chunks = run_chunked(tasks, workers)
+
+    mean_series = {}
+    for module, all_times in zip(modules, grids):
+        mean_values = np.concatenate([c for o, c in zip(owners, chunks) if o == module])
+        if convert_to_ms:
+            mean_values = mean_values * 1000
+        mean_series[module] = (list(all_times), list(mean_values))
     return mean_series
 
 def compute_totals(scalars, key):
@@ -1,19 +1,44 @@
-import matplotlib.pyplot as plt
 import numpy as np
-import matplotlib.patches as mpatches
 from data_extraction import *
+from lazy_import import LazyModule
+from summary import (
+    print_vector_statistics,
+    print_scalar_statistics,
+    print_total_packets,
+    print_all_statistics,
+)
 
-def plot_mean_time_series(mean_series, title, ylabel, y_limits=None, x_limit=None, save_path=None):
-    plt.figure(figsize=(10, 6))
+plt = LazyModule("matplotlib.pyplot")
+mpatches = LazyModule("matplotlib.patches")
+
+def plot_mean_time_series(mean_series, title, ylabel, y_limits=None, x_limit=None, save_path=None, bands=None, figure=None):
+    # Con `figure` si ridisegna sempre la stessa finestra (es. aggiornamento live)
+    plt.figure(figure, figsize=(10, 6))
+    if figure is not None:
+        plt.clf()
+    # Media globale sui soli punti mostrati (dentro x_limit, se indicato)
     all_values = []
-    for module, (_, values) in mean_series.items():
-        all_values.extend(values)
-    global_mean = np.mean(all_values) if all_values else 0.0
+    for module, (times, values) in mean_series.items():
+        values = np.asarray(values, dtype=float)
+        if x_limit:
+            times = np.asarray(times, dtype=float)
+            values = values[(times >= x_limit[0]) & (times <= x_limit[1])]
+        all_values.append(values)
+    all_values = np.concatenate(all_values) if all_values else np.array([])
+    global_mean = all_values.mean() if len(all_values) else 0.0
     for module in sorted(mean_series.keys()):
         times, values = mean_series[module]
+        times = np.asarray(times, dtype=float)
+        values = np.asarray(values, dtype=float)
+        idx = slice(None)
         if x_limit:
-            times, values = zip(*[(t, v) for t, v in zip(times, values) if x_limit[0] <= t <= x_limit[1]])
-        plt.plot(times, values, label=module)
+            idx = (times >= x_limit[0]) & (times <= x_limit[1])
+        line, = plt.plot(times[idx], values[idx], label=module)
+        if bands and module in bands:
+            b = bands[module]
+            color = line.get_color()
+            plt.fill_between(times[idx], b["q_low"][idx], b["q_high"][idx], color=color, alpha=0.1, linewidth=0)
+            plt.fill_between(times[idx], b["ci_low"][idx], b["ci_high"][idx], color=color, alpha=0.3, linewidth=0)
     plt.axhline(global_mean, color='red', linestyle='--', label=f"Global Mean = {global_mean:.2f}")
     plt.title(title)
     plt.xlabel("Time (s)")
@@ -136,13 +161,14 @@ def plot_boxplots(vectors, scalars, opz):
         ylabel="Number of Dropped Packets"
     )
 
-def plot_timeseries(mean_queue_length, mean_response_time, QUEUE_Y_LIMITS=None, RESPONSE_Y_LIMITS=None, X_LIMIT=None):
+def plot_timeseries(mean_queue_length, mean_response_time, QUEUE_Y_LIMITS=None, RESPONSE_Y_LIMITS=None, X_LIMIT=None, queue_bands=None, response_bands=None):
     plot_mean_time_series(
         mean_queue_length,
         "Average Queue Length",
         "Queue Length",
         y_limits=QUEUE_Y_LIMITS,
         x_limit=X_LIMIT,
+        bands=queue_bands,
     )
     plot_mean_time_series(
         mean_response_time,
@@ -150,46 +176,9 @@ def plot_timeseries(mean_queue_length, mean_response_time, QUEUE_Y_LIMITS=None,
         "Response Time (ms)",
         y_limits=RESPONSE_Y_LIMITS,
         x_limit=X_LIMIT,
+        bands=response_bands,
     )
 
-def print_vector_statistics(vectors, key, label, convert_to_ms=False):
-    print(f"\n=== {label} Statistics ===")
-    data = flatten_vector_data(vectors, key, convert_to_ms=convert_to_ms)
-    if not data:
-        print(f"  Nessun dato disponibile per il vettore '{key}'.")
-        return
-    for module, values in data.items():
-        mean, margin, ci_low, ci_high = compute_average_and_ci(values)
-        print(f"{module}: mean = {mean:.2f}, 95% CI = [{ci_low:.2f}, {ci_high:.2f}]")
-    print()
-
-def print_scalar_statistics(scalars, key, label):
-    print(f"\n=== {label} Statistics ===")
-    data = compute_averages_with_ci(scalars, key)
-    if not data:
-        print(f"  Nessun dato disponibile per lo scalare '{key}'.")
-        return
-    for module, stats in data.items():
-        mean = stats["mean"]
-        margin = stats["margin"]
-        ci_low = stats["ci_low"]
-        ci_high = stats["ci_high"]
-        print(f"{module}: mean = {mean:.2f}, 95% CI = [{ci_low:.2f}, {ci_high:.2f}]")
-    print()
-
-def print_total_packets(scalars, key, label):
-    total = compute_totals(scalars, key)
-    print(f"Total {label}: {total}\n")
-
-def print_all_statistics(scalars, vectors):
-    print_vector_statistics(vectors, key="responseTime:vector", label="Response Time", convert_to_ms=True)
-    print_vector_statistics(vectors, key="queueLength:vector", label="Queue Length", convert_to_ms=False)
-    print_scalar_statistics(scalars, key="dropped:count", label="Dropped Packets")
-    print_scalar_statistics(scalars, key="forwarded:count", label="Forwarded Packets")
-    print_total_packets(scalars, key="dropped:count", label="Dropped Packets")
-    print_total_packets(scalars, key="forwarded:count", label="Forwarded Packets")
-
-
 def plot_aggregated_time_series(vectors, key, title, convert_to_ms=False, y_limits=None, x_limit=None, save_path=None):
     valid_modules = []
     all_times_list = []
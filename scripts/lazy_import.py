@@ -0,0 +1,13 @@
+import importlib
+
+class LazyModule:
+    # Il modulo viene importato al primo accesso a un attributo, cosi' chi
+    # usa solo le statistiche non paga l'avvio di matplotlib
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
@@ -0,0 +1,195 @@
+import os
+import math
+import numpy as np
+from collections import defaultdict
+from data_extraction import compute_mean_time_series
+
+# Lettura incrementale di un file .vec di OMNeT++ ancora in scrittura: a ogni
+# poll si leggono solo i byte aggiunti e si aggiornano statistiche e sketch.
+#
+#   vector <id> <module> <name> [ETV|TV]   dichiarazione del vettore
+#   <id> <event> <time> <value>            record (colonne secondo la dichiarazione)
+
+class QuantileSketch:
+    # Istogramma a bucket logaritmici (errore relativo ~ `accuracy`) per
+    # stimare i quantili in streaming con memoria costante
+    def __init__(self, accuracy=0.01):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets = defaultdict(int)
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        positive = values[values > 0]
+        self.zeros += len(values) - len(positive)
+        if len(positive):
+            keys, counts = np.unique(np.ceil(np.log(positive) / self.log_gamma).astype(int), return_counts=True)
+            for k, c in zip(keys, counts):
+                self.buckets[int(k)] += int(c)
+        self.count += len(values)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for k in sorted(self.buckets):
+            seen += self.buckets[k]
+            if rank < seen:
+                return 2 * self.gamma ** k / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+class RunningStats:
+    # Media e varianza con l'aggiornamento a blocchi di Chan et al.
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch()
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        n = len(values)
+        if n == 0:
+            return
+        batch_mean = values.mean()
+        batch_m2 = ((values - batch_mean) ** 2).sum()
+        delta = batch_mean - self.mean
+        total = self.count + n
+        self.mean += delta * n / total
+        self.m2 += batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.sketch.add(values)
+
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+class VectorTail:
+    def __init__(self, vec_path, keys=("responseTime:vector", "queueLength:vector")):
+        self.vec_path = vec_path
+        self.keys = keys
+        self.offset = 0
+        self.remainder = b""
+        self.run = None
+        self.declarations = {}
+        self.times = defaultdict(lambda: defaultdict(list))
+        self.values = defaultdict(lambda: defaultdict(list))
+        self.stats = defaultdict(lambda: defaultdict(RunningStats))
+
+    def poll(self):
+        # Legge solo i byte nuovi; l'ultima riga incompleta resta in sospeso
+        try:
+            size = os.path.getsize(self.vec_path)
+        except OSError:
+            return 0
+        if size < self.offset:
+            # File riscritto (nuova run): si ricomincia da capo
+            self.__init__(self.vec_path, self.keys)
+        if size == self.offset:
+            return 0
+        with open(self.vec_path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read(size - self.offset)
+            self.offset += len(chunk)
+
+        lines = (self.remainder + chunk).split(b"\n")
+        self.remainder = lines.pop()
+        return self._parse([line.decode("utf-8").rstrip("\r") for line in lines])
+
+    def _parse(self, lines):
+        records = defaultdict(list)
+        for line in lines:
+            if not line or not line[0].isdigit():
+                self._parse_header(line)
+                continue
+            fields = line.split()
+            vector_id = int(fields[0])
+            if vector_id in self.declarations:
+                records[vector_id].append(fields)
+
+        n_records = 0
+        for vector_id, rows in records.items():
+            module, name, columns = self.declarations[vector_id]
+            t_col = columns.index("T") + 1
+            v_col = columns.index("V") + 1
+            t = np.array([row[t_col] for row in rows], dtype=float)
+            v = np.array([row[v_col] for row in rows], dtype=float)
+            self.times[module][name].append(t)
+            self.values[module][name].append(v)
+            self.stats[module][name].add(v)
+            n_records += len(rows)
+        return n_records
+
+    def _parse_header(self, line):
+        fields = line.split()
+        if not fields:
+            return
+        if fields[0] == "run":
+            self.run = fields[1]
+        elif fields[0] == "vector" and len(fields) >= 4:
+            vector_id, module, name = int(fields[1]), fields[2], fields[3]
+            columns = fields[4] if len(fields) > 4 else "TV"
+            if self.keys is None or name in self.keys:
+                self.declarations[vector_id] = (module, name, columns)
+
+    def vectors(self):
+        # Stessa struttura di extract_statistics (una sola run)
+        vectors = defaultdict(lambda: defaultdict(list))
+        for module, metrics in self.times.items():
+            for name, chunks in metrics.items():
+                vectors[module][name].append((np.concatenate(chunks), np.concatenate(self.values[module][name])))
+        return vectors
+
+    def unstable_modules(self, queue_size=50, fraction=0.9, window=50.0):
+        # Base station con coda media vicina alla capacita' nell'ultima finestra
+        unstable = []
+        for module, metrics in self.vectors().items():
+            if "queueLength:vector" not in metrics:
+                continue
+            times, values = metrics["queueLength:vector"][0]
+            recent = values[times >= times[-1] - window]
+            if len(recent) and recent.mean() >= fraction * queue_size:
+                unstable.append(module)
+        return unstable
+
+def print_live_statistics(tail):
+    print(f"\n=== Live statistics ({tail.run}) ===")
+    for module in sorted(tail.stats.keys()):
+        for name, s in tail.stats[module].items():
+            print(f"{module} {name}: n = {s.count}, mean = {s.mean:.4f}, std = {s.std():.4f}, "
+                  f"p50 = {s.sketch.quantile(0.5):.4f}, p95 = {s.sketch.quantile(0.95):.4f}, max = {s.max:.4f}")
+    print()
+
+def follow(vec_path, interval=5.0, key="queueLength:vector", ylabel="Queue Length", convert_to_ms=False,
+           queue_size=50, stop_when_unstable=False, max_polls=None):
+    from data_plot import plt, plot_mean_time_series
+    tail = VectorTail(vec_path)
+    plt.ion()
+    polls = 0
+    while max_polls is None or polls < max_polls:
+        polls += 1
+        if tail.poll():
+            mean_series = compute_mean_time_series(tail.vectors(), key, convert_to_ms=convert_to_ms)
+            plot_mean_time_series(mean_series, f"Live {ylabel}", ylabel, figure="live")
+            print_live_statistics(tail)
+            unstable = tail.unstable_modules(queue_size=queue_size)
+            if unstable:
+                print(f"[WARNING] Queue close to capacity at: {', '.join(unstable)}")
+                if stop_when_unstable:
+                    return tail
+        plt.pause(interval)
+    return tail
+
+
+if __name__ == "__main__":
+    VEC_FILE = "../EdgeComputing_Project/simulations/results/General-#0.vec"
+
+    follow(VEC_FILE, interval=5.0)
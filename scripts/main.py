@@ -1,25 +1,38 @@
 from data_extraction import *
 from data_plot import *
+from time_pyramid import select_window, load_with_pyramids
 
-def plot_graph(file_name, SUBSAMPLE_NUMBER, SUBSAMPLE_RATE, QUEUE_Y_LIMITS, RESPONSE_Y_LIMITS, X_LIMIT):
+def plot_graph(file_name, SUBSAMPLE_NUMBER, SUBSAMPLE_RATE, QUEUE_Y_LIMITS, RESPONSE_Y_LIMITS, X_LIMIT, POINTS=None):
     JSON_INPUT_FILE = f"data/{file_name}.json"
     
     params = parse_filename(JSON_INPUT_FILE)
     opz = params["opzione"] 
 
     # Caricamento e preparazione dati
-    data = load_data(JSON_INPUT_FILE)
-    scalars, vectors = extract_statistics(data, SUBSAMPLE_RATE, SUBSAMPLE_NUMBER)
+    # Con POINTS dati e piramidi restano in memoria tra una chiamata e l'altra
+    pyramids = None
+    if POINTS is not None:
+        scalars, vectors, pyramids = load_with_pyramids(JSON_INPUT_FILE, SUBSAMPLE_RATE, SUBSAMPLE_NUMBER)
+    else:
+        data = load_data(JSON_INPUT_FILE)
+        scalars, vectors = extract_statistics(data, SUBSAMPLE_RATE, SUBSAMPLE_NUMBER)
     
     # Stampa di TUTTE le statistiche richieste
     print_all_statistics(scalars, vectors)
 
-    # Calcolo statistiche (medie temporali) per i plot
-    mean_queue_length = compute_mean_time_series(vectors, "queueLength:vector")
-    mean_response_time = compute_mean_time_series(vectors, "responseTime:vector", convert_to_ms=True)
+    # Calcolo statistiche (medie temporali, IC e quantili tra repliche) per i plot,
+    # solo sui campioni nella finestra X_LIMIT se indicata (con POINTS dalla piramide)
+    ts_vectors = vectors
+    if X_LIMIT is not None:
+        ts_vectors = select_window(vectors, X_LIMIT, keys=["queueLength:vector", "responseTime:vector"],
+                                   pyramids=pyramids, points=POINTS)
+    queue_bands = compute_ensemble_time_series(ts_vectors, "queueLength:vector")
+    response_bands = compute_ensemble_time_series(ts_vectors, "responseTime:vector", convert_to_ms=True)
+    mean_queue_length = bands_to_mean_series(queue_bands)
+    mean_response_time = bands_to_mean_series(response_bands)
 
     # Plot dei grafici di time series
-    plot_timeseries(mean_queue_length, mean_response_time,QUEUE_Y_LIMITS=QUEUE_Y_LIMITS,RESPONSE_Y_LIMITS=RESPONSE_Y_LIMITS,X_LIMIT=X_LIMIT)
+    plot_timeseries(mean_queue_length, mean_response_time,QUEUE_Y_LIMITS=QUEUE_Y_LIMITS,RESPONSE_Y_LIMITS=RESPONSE_Y_LIMITS,X_LIMIT=X_LIMIT,queue_bands=queue_bands,response_bands=response_bands)
 
     # Plot dei boxplot
     plot_boxplots(vectors, scalars, opz)
@@ -36,5 +49,6 @@ if __name__ == "__main__":
     QUEUE_Y_LIMITS = None #(0,60)
     RESPONSE_Y_LIMITS = None #(0,100)
     X_LIMIT = None #(0, 500)
+    POINTS = None #2000 (almeno tanti campioni per serie nella finestra)
     
-    plot_graph(file_name, SUBSAMPLE_NUMBER, SUBSAMPLE_RATE, QUEUE_Y_LIMITS, RESPONSE_Y_LIMITS, X_LIMIT)
\ No newline at end of file
+    plot_graph(file_name, SUBSAMPLE_NUMBER, SUBSAMPLE_RATE, QUEUE_Y_LIMITS, RESPONSE_Y_LIMITS, X_LIMIT, POINTS)
\ No newline at end of file
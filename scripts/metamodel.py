@@ -0,0 +1,155 @@
+import os
+import itertools
+import numpy as np
+from data_extraction import load_data, parse_filename, compute_average_and_ci, per_run_metrics
+from control_variates import observed_arrivals
+
+# Metamodello per interpolare le prestazioni su configurazioni non simulate:
+# trend lineare sugli input in scala log10 (N, interarrival, size rate) piu'
+# un processo gaussiano sui residui, con rumore per punto ricavato dagli IC.
+# Le uscite sono modellate come log(1 + y), per cui le previsioni restano positive.
+
+META_METRICS = ("responseTime", "queueLength", "dropRate")
+INPUT_PARAMS = ("n_users", "interarrival", "size_rate")
+LENGTH_SCALES = (0.25, 0.5, 1.0, 2.0, 4.0)
+MIN_PRIOR_VARIANCE = 0.01
+
+def configuration_statistics(data):
+    per_run = per_run_metrics(data)
+    arrivals = observed_arrivals(data)
+    per_run["dropRate"] = [d / a if a > 0 else 0.0 for d, a in zip(per_run["dropped"], arrivals)]
+    stats = {}
+    for metric in META_METRICS:
+        mean, margin, _, _ = compute_average_and_ci(per_run[metric])
+        stats[metric] = (mean, margin)
+    return stats
+
+def load_configurations(file_list, data_dir="data"):
+    configurations = []
+    for json_file in file_list:
+        params = parse_filename(json_file)
+        data = load_data(os.path.join(data_dir, json_file))
+        configurations.append((params, configuration_statistics(data)))
+    return configurations
+
+def _inputs(rows):
+    return np.log10(np.array([[float(r[p]) for p in INPUT_PARAMS] for r in rows], dtype=float))
+
+def _kernel(a, b, variance, length_scale):
+    d2 = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2)
+    return variance * np.exp(-0.5 * d2 / length_scale ** 2)
+
+def _design(x):
+    return np.column_stack((np.ones(len(x)), x))
+
+def fit_gp(x, y, noise_var):
+    n = len(y)
+    # Trend lineare (minimi quadrati) se ci sono abbastanza punti, altrimenti costante
+    design = _design(x) if n > x.shape[1] + 1 else np.ones((n, 1))
+    coef, *_ = np.linalg.lstsq(design, y, rcond=None)
+    residuals = y - design @ coef
+    # Varianza a priori: almeno ~10% relativo in scala log, anche con pochi punti
+    variance = max(np.var(y), np.mean(noise_var), MIN_PRIOR_VARIANCE)
+
+    best = None
+    for length_scale in LENGTH_SCALES:
+        k = _kernel(x, x, variance, length_scale) + np.diag(noise_var + 1e-8)
+        try:
+            chol = np.linalg.cholesky(k)
+        except np.linalg.LinAlgError:
+            continue
+        alpha = np.linalg.solve(chol.T, np.linalg.solve(chol, residuals))
+        log_likelihood = -0.5 * residuals @ alpha - np.log(np.diag(chol)).sum() - 0.5 * n * np.log(2 * np.pi)
+        if best is None or log_likelihood > best["log_likelihood"]:
+            best = {
+                "x": x,
+                "coef": coef,
+                "variance": variance,
+                "length_scale": length_scale,
+                "chol": chol,
+                "alpha": alpha,
+                "log_likelihood": log_likelihood,
+            }
+    return best
+
+def predict_gp(model, x_new):
+    design = _design(x_new) if len(model["coef"]) > 1 else np.ones((len(x_new), 1))
+    k_star = _kernel(x_new, model["x"], model["variance"], model["length_scale"])
+    mean = design @ model["coef"] + k_star @ model["alpha"]
+    v = np.linalg.solve(model["chol"], k_star.T)
+    var = np.maximum(model["variance"] - (v ** 2).sum(axis=0), 0.0)
+    return mean, np.sqrt(var)
+
+def fit_metamodel(configurations):
+    # Un modello per (distribuzione, opzione) e per metrica
+    groups = {}
+    for params, stats in configurations:
+        groups.setdefault((params["distribution"], params["opzione"]), []).append((params, stats))
+
+    metamodel = {}
+    for group, rows in groups.items():
+        x = _inputs([params for params, _ in rows])
+        metamodel[group] = {}
+        for metric in META_METRICS:
+            means = np.array([stats[metric][0] for _, stats in rows], dtype=float)
+            margins = np.array([stats[metric][1] for _, stats in rows], dtype=float)
+            y = np.log1p(means)
+            # Delta method: sd in scala log(1 + y)
+            noise_var = (margins / 1.96 / (1.0 + means)) ** 2
+            metamodel[group][metric] = fit_gp(x, y, noise_var)
+    return metamodel
+
+def predict_configuration(metamodel, distribution, opzione, n_users, interarrival, size_rate, z=1.96):
+    x = _inputs([{"n_users": n_users, "interarrival": interarrival, "size_rate": size_rate}])
+    predictions = {}
+    for metric, model in metamodel[(distribution, opzione)].items():
+        mean, sd = predict_gp(model, x)
+        predictions[metric] = {
+            "mean": float(np.expm1(mean[0])),
+            "ci_low": float(np.expm1(mean[0] - z * sd[0])),
+            "ci_high": float(np.expm1(mean[0] + z * sd[0])),
+            "sd_log": float(sd[0]),
+        }
+    return predictions
+
+def candidate_grid(n_users=(100, 250, 500, 750, 1000), interarrival=(0.1, 0.25, 0.5, 1.0), size_rate=(1e2, 3e2, 1e3, 3e3, 1e4)):
+    return [
+        {"n_users": n, "interarrival": i, "size_rate": s}
+        for n, i, s in itertools.product(n_users, interarrival, size_rate)
+    ]
+
+def suggest_next_configuration(metamodel, distribution, opzione, candidates=None):
+    # La configurazione con la maggiore incertezza predittiva (somma delle
+    # varianze in scala log su tutte le metriche) e' quella che la riduce di piu'
+    if candidates is None:
+        candidates = candidate_grid()
+    x = _inputs(candidates)
+    total_var = np.zeros(len(candidates))
+    for model in metamodel[(distribution, opzione)].values():
+        _, sd = predict_gp(model, x)
+        total_var += sd ** 2
+    best = int(np.argmax(total_var))
+    return candidates[best], float(total_var[best])
+
+def print_prediction(predictions, label):
+    print(f"\n=== Metamodel prediction: {label} ===")
+    for metric, p in predictions.items():
+        print(f"{metric}: mean = {p['mean']:.4f}, 95% CI = [{p['ci_low']:.4f}, {p['ci_high']:.4f}]")
+    print()
+
+
+if __name__ == "__main__":
+    file_list = [
+        "Uniform_A_N250_I05_S1e2.json",
+        "Uniform_A_N250_I05_S1e3.json",
+        "Uniform_A_N250_I05_S1e4.json",
+        "Uniform_A_N500_I05_S1e3.json"
+    ]
+
+    metamodel = fit_metamodel(load_configurations(file_list))
+
+    predictions = predict_configuration(metamodel, "Uniform", "A", n_users=375, interarrival=0.5, size_rate=3e3)
+    print_prediction(predictions, "Uniform, Option A, N=375, I=0.5, S=3e3")
+
+    candidate, uncertainty = suggest_next_configuration(metamodel, "Uniform", "A")
+    print(f"Next configuration to simulate: {candidate} (log-variance {uncertainty:.4f})")
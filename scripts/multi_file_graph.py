@@ -1,42 +1,44 @@
 import os
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
 from data_extraction import *
+from time_pyramid import select_window, load_with_pyramids
+from lazy_import import LazyModule
+
+plt = LazyModule("matplotlib.pyplot")
+mpatches = LazyModule("matplotlib.patches")
+
+def _aggregate_sum_chunk(series, grid):
+    # `series`: coppie di array float64 gia' convertite (as_float_series)
+    sum_values = np.zeros_like(grid, dtype=float)
+    for times, values in series:
+        if len(times) > 1:
+            interpolated = np.interp(grid, times, values)
+        else:
+            if len(values) > 0:
+                interpolated = np.full_like(grid, values[0])
+            else:
+                interpolated = np.zeros_like(grid)
 
-def aggregate_mean_time_series(vectors, key, convert_to_ms=False):
-    valid_modules = []
-    all_times_list = []
-    for module, metric_dict in vectors.items():
-        if key in metric_dict:
-            valid_modules.append(module)
-            for times, values in metric_dict[key]:
-                all_times_list.extend(times)
+        sum_values += interpolated
+    return sum_values
 
+def aggregate_mean_time_series(vectors, key, convert_to_ms=False, workers=None):
+    valid_modules = [module for module, metric_dict in vectors.items() if key in metric_dict]
     if not valid_modules:
         return np.array([]), np.array([])
 
-    all_times = np.unique(all_times_list)
+    # Stesso ordine di somma (moduli, poi run) per ogni blocco della griglia
+    series = as_float_series([s for module in valid_modules for s in vectors[module][key]])
+    all_times = np.unique(np.concatenate([times for times, _ in series])) if series else np.array([])
     if len(all_times) == 0:
         return np.array([]), np.array([])
 
-    sum_values = np.zeros_like(all_times, dtype=float)
-    count_values = np.zeros_like(all_times, dtype=float)
-
-    for module in valid_modules:
-        for times, values in vectors[module][key]:
-            times = np.array(times, dtype=float)
-            values = np.array(values, dtype=float)
-            if len(times) > 1:
-                interpolated = np.interp(all_times, times, values)
-            else:
-                if len(values) > 0:
-                    interpolated = np.full_like(all_times, values[0])
-                else:
-                    interpolated = np.zeros_like(all_times)
-
-            sum_values += interpolated
-            count_values += 1.0
+    chunks = run_chunked(
+        [lambda g=all_times[c]: _aggregate_sum_chunk(series, g) for c in grid_chunks(len(all_times), workers)],
+        workers,
+    )
+    sum_values = np.concatenate(chunks)
+    count_values = np.full_like(all_times, float(len(series)))
 
     with np.errstate(divide='ignore', invalid='ignore'):
         mean_values = np.divide(
@@ -59,7 +61,9 @@ def plot_graph(file_list,
                RESPONSE_Y_LIMITS,
                X_LIMIT,
                boxplot_whiskers=None,
-               boxplot_y_limits=None):
+               boxplot_y_limits=None,
+               workers=None,
+               points=None):
 
     if boxplot_whiskers is None:
         whiskers = 1.5
@@ -95,19 +99,30 @@ def plot_graph(file_list,
         label_str = f"{dist}, Option {opz}, λ={iat}, N={num_user}, S={size_rate}"
 
         file_name = f"data/{json_file}"
-        data = load_data(file_name)
-        scalars, vectors = extract_statistics(
-            data,
-            subsample_rate=SUBSAMPLE_RATE,
-            subsample_number=SUBSAMPLE_NUMBER
-        )
+        # Con `points` dati e piramidi restano in memoria tra una chiamata e l'altra
+        pyramids = None
+        if points is not None:
+            scalars, vectors, pyramids = load_with_pyramids(file_name, SUBSAMPLE_RATE, SUBSAMPLE_NUMBER)
+        else:
+            data = load_data(file_name)
+            scalars, vectors = extract_statistics(
+                data,
+                subsample_rate=SUBSAMPLE_RATE,
+                subsample_number=SUBSAMPLE_NUMBER
+            )
+
+        # Con X_LIMIT si aggregano solo i campioni nella finestra (ricerca binaria);
+        # con `points` si usa il livello della piramide adatto alla finestra
+        if X_LIMIT is not None:
+            vectors = select_window(vectors, X_LIMIT, keys=["responseTime:vector", "queueLength:vector"],
+                                    pyramids=pyramids, points=points)
 
         # --- Estraggo i dati per i grafici temporali di RT e QL ---
         rt_times, rt_values = aggregate_mean_time_series(
-            vectors, "responseTime:vector", convert_to_ms=True
+            vectors, "responseTime:vector", convert_to_ms=True, workers=workers
         )
         ql_times, ql_values = aggregate_mean_time_series(
-            vectors, "queueLength:vector", convert_to_ms=False
+            vectors, "queueLength:vector", convert_to_ms=False, workers=workers
         )
 
         # --- Applico eventuali limiti sull'asse x ---
@@ -291,6 +306,7 @@ if __name__ == "__main__":
     QUEUE_Y_LIMITS = (0, 60)
     RESPONSE_Y_LIMITS = None  # (0, 600)
     X_LIMIT = (100, 500)
+    POINTS = None  # Es. 2000: almeno tanti campioni per serie nella finestra (piramide)
 
     boxplot_whiskers = None
     # boxplot_whiskers = (5, 95)
@@ -304,5 +320,6 @@ if __name__ == "__main__":
         RESPONSE_Y_LIMITS,
         X_LIMIT,
         boxplot_whiskers=boxplot_whiskers,
-        boxplot_y_limits=boxplot_y_limits
+        boxplot_y_limits=boxplot_y_limits,
+        points=POINTS
     )
@@ -0,0 +1,127 @@
+import os
+import numpy as np
+from data_extraction import load_data, parse_filename, per_run_metrics, student_t_quantile
+from lazy_import import LazyModule
+
+plt = LazyModule("matplotlib.pyplot")
+
+# Con seed-set = ${repetition} le run di Option A e Option B con la stessa
+# ripetizione usano gli stessi stream casuali (common random numbers): si
+# confrontano quindi le differenze per coppia invece dei due campioni separati.
+
+COMPARE_METRICS = (
+    ("responseTime", "Response Time (ms)"),
+    ("queueLength", "Queue Length"),
+    ("dropped", "Dropped Packets"),
+)
+
+def run_repetitions(data):
+    repetitions = []
+    for index, (run_name, run_content) in enumerate(data.items()):
+        attributes = run_content.get("attributes", {})
+        repetition = attributes.get("repetition")
+        repetitions.append(int(repetition) if repetition is not None else index)
+    return repetitions
+
+def per_repetition_metrics(data):
+    metrics = per_run_metrics(data)
+    repetitions = run_repetitions(data)
+    return {name: dict(zip(repetitions, values)) for name, values in metrics.items()}
+
+def paired_differences(data_a, data_b, metrics=COMPARE_METRICS, confidence=0.95):
+    per_rep_a = per_repetition_metrics(data_a)
+    per_rep_b = per_repetition_metrics(data_b)
+    results = {}
+    for metric, _ in metrics:
+        a = per_rep_a[metric]
+        b = per_rep_b[metric]
+        common = sorted(set(a) & set(b))
+        values_a = np.array([a[r] for r in common], dtype=float)
+        values_b = np.array([b[r] for r in common], dtype=float)
+        diff = values_a - values_b
+
+        # Con poche ripetizioni serve il quantile t di Student (n - 1 gradi di liberta')
+        n = len(common)
+        mean = diff.mean() if n else 0.0
+        if n > 1:
+            margin = student_t_quantile(confidence, n - 1) * np.std(diff, ddof=1) / np.sqrt(n)
+            # Semi-ampiezza che si otterrebbe trattando i due campioni come
+            # indipendenti (Welch, gradi di liberta' di Satterthwaite arrotondati per difetto)
+            se_a = np.var(values_a, ddof=1) / n
+            se_b = np.var(values_b, ddof=1) / n
+            if se_a + se_b > 0:
+                dof = int((se_a + se_b) ** 2 / ((se_a ** 2 + se_b ** 2) / (n - 1)))
+                unpaired_margin = student_t_quantile(confidence, dof) * np.sqrt(se_a + se_b)
+            else:
+                unpaired_margin = 0.0
+        else:
+            margin = 0.0
+            unpaired_margin = 0.0
+        ci_low = mean - margin
+        ci_high = mean + margin
+
+        if ci_high < 0:
+            winner = "A"
+        elif ci_low > 0:
+            winner = "B"
+        else:
+            winner = None
+        results[metric] = {
+            "repetitions": common,
+            "mean_a": values_a.mean() if n else 0.0,
+            "mean_b": values_b.mean() if n else 0.0,
+            "mean": mean,
+            "margin": margin,
+            "ci_low": ci_low,
+            "ci_high": ci_high,
+            "unpaired_margin": unpaired_margin,
+            "winner": winner,
+        }
+    return results
+
+def compare_files(file_a, file_b, data_dir="data"):
+    data_a = load_data(os.path.join(data_dir, file_a))
+    data_b = load_data(os.path.join(data_dir, file_b))
+    return paired_differences(data_a, data_b)
+
+def print_paired_comparison(results, label_a="A", label_b="B", metrics=COMPARE_METRICS):
+    print(f"\n=== Paired comparison ({label_a} - {label_b}) ===")
+    for metric, label in metrics:
+        r = results[metric]
+        winner = {"A": label_a, "B": label_b}.get(r["winner"], "no significant difference")
+        print(f"{label}: n = {len(r['repetitions'])}, mean diff = {r['mean']:.2f}, "
+              f"95% CI = [{r['ci_low']:.2f}, {r['ci_high']:.2f}] "
+              f"(unpaired +/-{r['unpaired_margin']:.2f}) -> lower: {winner}")
+    print()
+
+def plot_paired_comparison(results, label_a="A", label_b="B", metrics=COMPARE_METRICS, save_path=None):
+    fig, axes = plt.subplots(1, len(metrics), figsize=(4 * len(metrics), 5))
+    for ax, (metric, label) in zip(np.atleast_1d(axes), metrics):
+        r = results[metric]
+        ax.errorbar([0], [r["mean"]], yerr=[r["margin"]], fmt='o', capsize=5, label="Paired (CRN)")
+        ax.errorbar([1], [r["mean"]], yerr=[r["unpaired_margin"]], fmt='o', capsize=5, color='gray', label="Unpaired")
+        ax.axhline(0, color='red', linestyle='--')
+        ax.set_xticks([0, 1])
+        ax.set_xticklabels(["Paired", "Unpaired"])
+        ax.set_xlim(-0.5, 1.5)
+        ax.set_title(f"{label}\n{label_a} - {label_b}")
+        ax.grid(True, linestyle="--", alpha=0.7)
+    plt.tight_layout()
+    if save_path:
+        plt.savefig(save_path)
+    else:
+        plt.show()
+
+
+if __name__ == "__main__":
+    file_a = "Lognormal_A_N500_I05_S1e3.json"
+    file_b = "Lognormal_B_N500_I05_S1e3.json"
+
+    params_a = parse_filename(file_a)
+    params_b = parse_filename(file_b)
+    label_a = f"Option {params_a['opzione']}"
+    label_b = f"Option {params_b['opzione']}"
+
+    results = compare_files(file_a, file_b)
+    print_paired_comparison(results, label_a, label_b)
+    plot_paired_comparison(results, label_a, label_b)
@@ -1,7 +1,5 @@
 import os
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
 from data_extraction import (
     parse_filename,
     load_data,
@@ -10,6 +8,11 @@ from data_extraction import (
 from multi_file_graph import (
     aggregate_mean_time_series
 )
+from time_pyramid import select_window, load_with_pyramids
+from lazy_import import LazyModule
+
+plt = LazyModule("matplotlib.pyplot")
+mpatches = LazyModule("matplotlib.patches")
 
 def plot_by_parameter(
     file_list,
@@ -17,7 +20,8 @@ def plot_by_parameter(
     SUBSAMPLE_RATE,
     param_name="N",  
     X_LIMIT=None,
-    ci_z=1.96
+    ci_z=1.96,
+    points=None
 ):
     # Dizionario per salvare i risultati raggruppati per valore di param_name
     results = {}
@@ -42,12 +46,23 @@ def plot_by_parameter(
             raise ValueError("param_name non valido. Usa 'N', 'I' o 'S'.")
 
         file_name = os.path.join("data", json_file)
-        data = load_data(file_name)
-        scalars, vectors = extract_statistics(
-            data,
-            subsample_rate=SUBSAMPLE_RATE,
-            subsample_number=SUBSAMPLE_NUMBER
-        )
+        # Con `points` dati e piramidi restano in memoria tra una chiamata e l'altra
+        pyramids = None
+        if points is not None:
+            scalars, vectors, pyramids = load_with_pyramids(file_name, SUBSAMPLE_RATE, SUBSAMPLE_NUMBER)
+        else:
+            data = load_data(file_name)
+            scalars, vectors = extract_statistics(
+                data,
+                subsample_rate=SUBSAMPLE_RATE,
+                subsample_number=SUBSAMPLE_NUMBER
+            )
+
+        # Con X_LIMIT si aggregano solo i campioni nella finestra (ricerca binaria);
+        # con `points` si usa il livello della piramide adatto alla finestra
+        if X_LIMIT is not None:
+            vectors = select_window(vectors, X_LIMIT, keys=["responseTime:vector", "queueLength:vector"],
+                                    pyramids=pyramids, points=points)
 
         # Otteniamo i vettori medi nel tempo
         rt_times, rt_values = aggregate_mean_time_series(
@@ -175,6 +190,7 @@ if __name__ == "__main__":
     SUBSAMPLE_RATE = 90
     
     X_LIMIT = None  # Oppure (0, 500)
+    POINTS = None  # Es. 2000: almeno tanti campioni per serie nella finestra (piramide)
 
     # Parametro che varia: "N", "I", o "S"
     param_name = "S"
@@ -188,5 +204,6 @@ if __name__ == "__main__":
         SUBSAMPLE_RATE=SUBSAMPLE_RATE,
         param_name=param_name,
         X_LIMIT=X_LIMIT,
-        ci_z=ci_z
+        ci_z=ci_z,
+        points=POINTS
     )
@@ -0,0 +1,182 @@
+import re
+import numpy as np
+from data_extraction import parse_filename
+
+INI_PATH = "../EdgeComputing_Project/simulations/omnetpp.ini"
+
+# Previsioni M/M/1/K indipendenti per base station: valgono solo per l'opzione A
+# (locallyManaged, coda FIFO locale). Con l'opzione B BaseStation.cc inoltra i
+# task alla stazione meno carica, quindi carico e drop per stazione non sono
+# quelli di code indipendenti: in quel caso si solleva ValueError.
+
+# Valori di omnetpp.ini, usati se il file non e' disponibile
+DEFAULT_PARAMS = {
+    "sim-time-limit": 1000.0,
+    "width": 1800.0,
+    "height": 1800.0,
+    "numBaseStations": 9,
+    "serviceRate": 1e5,
+    "queueSize": 50,
+    "intervalRate": 1 / 0.5,
+    "sizeRate": 1 / 1e3,
+    "mean": 6.8024,
+    "std_dev": 0.4,
+}
+
+MODULE_NAME = "EdgeComputingNetwork.baseStations[{}]"
+
+def _parse_ini_value(raw):
+    raw = raw.strip().rstrip("s")
+    if raw in ("true", "false"):
+        return raw == "true"
+    if "/" in raw:
+        num, den = raw.split("/", 1)
+        return float(num) / float(den)
+    return float(raw)
+
+def load_ini_parameters(ini_path=INI_PATH):
+    params = dict(DEFAULT_PARAMS)
+    pattern = re.compile(r"^(?:\*\*\.(?:[\w\[\]\*]+\.)?)?([\w-]+)\s*=\s*([^#]+)")
+    try:
+        with open(ini_path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        return params
+    for line in lines:
+        match = pattern.match(line.strip())
+        if not match:
+            continue
+        name, raw = match.group(1), match.group(2).strip()
+        # I parametri di sweep (${...}) vanno passati esplicitamente
+        if raw.startswith("${"):
+            continue
+        try:
+            params[name] = _parse_ini_value(raw)
+        except ValueError:
+            continue
+    return params
+
+def base_station_positions(num_base_stations, width, height):
+    # Stessa griglia di BaseStation::initialize()
+    grid_rows = int(np.floor(np.sqrt(num_base_stations)))
+    grid_cols = int(np.ceil(num_base_stations / grid_rows))
+    idx = np.arange(num_base_stations)
+    x = (idx % grid_cols + 0.5) * (width / grid_cols)
+    y = (idx // grid_cols + 0.5) * (height / grid_rows)
+    return np.column_stack((x, y))
+
+def sample_user_positions(n_samples, distribution, params, rng=None):
+    rng = np.random.default_rng(rng)
+    width, height = params["width"], params["height"]
+    if distribution.lower() == "uniform":
+        x = rng.uniform(0, width, n_samples)
+        y = rng.uniform(0, height, n_samples)
+    else:
+        # Come in User::initialize(): troncamento a intero e clipping al bordo
+        x = np.minimum(np.floor(rng.lognormal(params["mean"], params["std_dev"], n_samples)), width)
+        y = np.minimum(np.floor(rng.lognormal(params["mean"], params["std_dev"], n_samples)), height)
+    return np.column_stack((x, y))
+
+def station_assignment_probabilities(distribution, params, n_samples=200000, rng=None):
+    bs = base_station_positions(int(params["numBaseStations"]), params["width"], params["height"])
+    users = sample_user_positions(n_samples, distribution, params, rng)
+    dist2 = ((users[:, None, :] - bs[None, :, :]) ** 2).sum(axis=2)
+    nearest = np.argmin(dist2, axis=1)
+    counts = np.bincount(nearest, minlength=len(bs))
+    return counts / n_samples
+
+def expected_task_bytes(mean_size):
+    # User.cc tronca a intero la dimensione esponenziale X e BaseStation.cc serve
+    # i task di 0 byte come 1 byte: E[max(floor X, 1)] = E[floor X] + P(X < 1)
+    return 1.0 / np.expm1(1.0 / mean_size) - np.expm1(-1.0 / mean_size)
+
+def mm1k_metrics(arrival_rate, service_rate, capacity):
+    lam = np.asarray(arrival_rate, dtype=float)
+    rho = lam / service_rate
+    n = np.arange(capacity + 1)
+    # Distribuzione stazionaria p_n proporzionale a rho^n, n = 0..K
+    weights = rho[..., None] ** n
+    probs = weights / weights.sum(axis=-1, keepdims=True)
+    p0 = probs[..., 0]
+    p_block = probs[..., -1]
+    mean_in_system = (probs * n).sum(axis=-1)
+    mean_in_queue = mean_in_system - (1.0 - p0)
+    throughput = lam * (1.0 - p_block)
+    # Little: W = L / lambda_eff (stazione senza traffico: solo servizio)
+    safe_throughput = np.where(throughput > 0, throughput, 1.0)
+    response_time = np.where(throughput > 0, mean_in_system / safe_throughput, 1.0 / service_rate)
+    return {
+        "utilization": 1.0 - p0,
+        "drop_probability": p_block,
+        "queue_length": mean_in_queue,
+        "system_length": mean_in_system,
+        "response_time": response_time,
+        "throughput": throughput,
+    }
+
+def predict_base_stations(n_users, distribution, interarrival=None, size_rate=None, params=None, n_samples=200000, rng=None, opzione="A"):
+    if opzione != "A":
+        raise ValueError("Il modello M/M/1/K vale solo per l'opzione A (nessun inoltro tra base station).")
+    if params is None:
+        params = load_ini_parameters()
+    interval_rate = 1.0 / interarrival if interarrival is not None else params["intervalRate"]
+    mean_size = float(size_rate) if size_rate is not None else 1.0 / params["sizeRate"]
+
+    probs = station_assignment_probabilities(distribution, params, n_samples, rng)
+    arrival_rate = n_users * interval_rate * probs
+
+    mean_bytes = expected_task_bytes(mean_size)
+    service_rate = params["serviceRate"] / mean_bytes
+    # Coda di queueSize posti piu' il task in servizio
+    capacity = int(params["queueSize"]) + 1
+    metrics = mm1k_metrics(arrival_rate, service_rate, capacity)
+    sim_time = params["sim-time-limit"]
+
+    predictions = {}
+    for i, lam in enumerate(arrival_rate):
+        predictions[MODULE_NAME.format(i)] = {
+            "arrival_rate": lam,
+            "utilization": metrics["utilization"][i],
+            "drop_probability": metrics["drop_probability"][i],
+            "queue_length": metrics["queue_length"][i],
+            "response_time": metrics["response_time"][i],
+            "dropped": lam * metrics["drop_probability"][i] * sim_time,
+        }
+    return predictions
+
+def predict_from_filename(filename, params=None, n_samples=200000, rng=None):
+    p = parse_filename(filename)
+    return predict_base_stations(
+        p["n_users"],
+        p["distribution"],
+        interarrival=p["interarrival"],
+        size_rate=p["size_rate"],
+        params=params,
+        n_samples=n_samples,
+        rng=rng,
+        opzione=p["opzione"],
+    )
+
+def predictions_as_ci(predictions, metric, convert_to_ms=False):
+    # Stesso formato di compute_averages_with_ci, con margine nullo
+    results = {}
+    for module, values in predictions.items():
+        v = values[metric] * (1000 if convert_to_ms else 1)
+        results[module] = {"mean": v, "margin": 0.0, "ci_low": v, "ci_high": v}
+    return results
+
+def print_predictions(predictions):
+    print("\n=== M/M/1/K Predictions ===")
+    for module in sorted(predictions.keys()):
+        p = predictions[module]
+        print(f"{module}: lambda = {p['arrival_rate']:.2f}/s, rho = {p['utilization']:.3f}, "
+              f"P(drop) = {p['drop_probability']:.4f}, queue = {p['queue_length']:.2f}, "
+              f"response = {p['response_time'] * 1000:.2f} ms, dropped = {p['dropped']:.1f}")
+    print()
+
+
+if __name__ == "__main__":
+    file_name = "Lognormal_A_N250_I05_S1e3"
+
+    predictions = predict_from_filename(file_name, rng=0)
+    print_predictions(predictions)
@@ -0,0 +1,133 @@
+import os
+import json
+import math
+import glob
+import subprocess
+import numpy as np
+from data_extraction import load_data, parse_filename, compute_average_and_ci, per_run_metrics
+
+SIMULATIONS_DIR = "../EdgeComputing_Project/simulations"
+DATA_DIR = "data"
+
+# Metriche per run usate per decidere il numero di ripetizioni
+PLAN_METRICS = ("responseTime", "queueLength", "dropped")
+
+def required_repetitions(values, rel_precision):
+    # n tale che margin / |mean| <= rel_precision, con la stessa formula
+    # (z * s / sqrt(n)) di compute_average_and_ci
+    n = len(values)
+    mean, margin, _, _ = compute_average_and_ci(values)
+    if n < 2:
+        return mean, margin, 2
+    if margin == 0:
+        return mean, margin, n
+    if mean == 0:
+        return mean, margin, math.inf
+    z_std = margin * math.sqrt(n)
+    needed = math.ceil((z_std / (rel_precision * abs(mean))) ** 2)
+    return mean, margin, max(needed, n)
+
+def plan_file(data, rel_precision=0.05, metrics=PLAN_METRICS):
+    per_run = per_run_metrics(data)
+    plan = {}
+    for metric in metrics:
+        values = per_run[metric]
+        mean, margin, needed = required_repetitions(values, rel_precision)
+        plan[metric] = {
+            "n": len(values),
+            "mean": mean,
+            "margin": margin,
+            "rel_margin": margin / abs(mean) if mean != 0 else (0.0 if margin == 0 else math.inf),
+            "needed": needed,
+            "additional": needed - len(values),
+        }
+    return plan
+
+def plan_repetitions(file_list, rel_precision=0.05, metrics=PLAN_METRICS, data_dir=DATA_DIR):
+    plans = {}
+    for json_file in file_list:
+        data = load_data(os.path.join(data_dir, json_file))
+        plans[json_file] = plan_file(data, rel_precision, metrics)
+    return plans
+
+def print_plan(plans, rel_precision):
+    print(f"\n=== Repetition plan (target relative half-width {rel_precision:.1%}) ===")
+    for json_file, plan in plans.items():
+        additional = max(p["additional"] for p in plan.values())
+        print(f"{json_file}: {additional} more repetitions")
+        for metric, p in plan.items():
+            print(f"  {metric}: n = {p['n']}, mean = {p['mean']:.2f}, 95% CI = +/-{p['margin']:.2f} "
+                  f"({p['rel_margin']:.1%}), needed = {p['needed']}")
+    print()
+
+def simulation_command(json_file, first_repetition, total_repetitions, result_dir):
+    # Fissa le variabili di iterazione di omnetpp.ini ai valori del file e
+    # seleziona solo le ripetizioni nuove
+    params = parse_filename(json_file)
+    uniform = "true" if params["distribution"].lower() == "uniform" else "false"
+    local = "true" if params["opzione"] == "A" else "false"
+    run_filter = (f"$numUsers=={params['n_users']} && $locallyManaged=={local} && "
+                  f"$uniformDistribution=={uniform} && $repetition>={first_repetition}")
+    return [
+        "./run", "-u", "Cmdenv", "-c", "General",
+        f"--repeat={total_repetitions}",
+        f"--result-dir={result_dir}",
+        f"--**.users[*].intervalRate=1/{params['interarrival']}",
+        f"--**.users[*].sizeRate=1/{params['size_rate']}",
+        "-r", run_filter,
+    ]
+
+def export_command(result_dir, json_path):
+    files = sorted(glob.glob(os.path.join(result_dir, "*.sca")) + glob.glob(os.path.join(result_dir, "*.vec")))
+    return ["opp_scavetool", "export", "-F", "JSON", "-o", json_path] + files
+
+def merge_results(json_path, new_json_path):
+    data = load_data(json_path)
+    data.update(load_data(new_json_path))
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    return data
+
+def run_until_precision(json_file, rel_precision=0.05, max_repetitions=50, metrics=PLAN_METRICS,
+                        data_dir=DATA_DIR, simulations_dir=SIMULATIONS_DIR, dry_run=False):
+    json_path = os.path.join(data_dir, json_file)
+    data = load_data(json_path)
+    while True:
+        plan = plan_file(data, rel_precision, metrics)
+        n = len(data)
+        needed = max(p["needed"] for p in plan.values())
+        if needed <= n:
+            return plan
+        if n >= max_repetitions:
+            print(f"{json_file}: reached max_repetitions = {max_repetitions} without target precision.")
+            return plan
+
+        total = int(min(needed, max_repetitions))
+        name = os.path.splitext(json_file)[0]
+        result_dir = os.path.join("results", f"{name}_r{n}-{total - 1}")
+        sim_cmd = simulation_command(json_file, n, total, result_dir)
+        new_json_path = os.path.abspath(os.path.join(data_dir, f"{name}_r{n}-{total - 1}.json"))
+        print(f"{json_file}: running repetitions {n}..{total - 1}")
+        print("  " + " ".join(sim_cmd))
+        if dry_run:
+            return plan
+
+        subprocess.run(sim_cmd, cwd=simulations_dir, check=True)
+        exp_cmd = export_command(os.path.join(simulations_dir, result_dir), new_json_path)
+        subprocess.run(exp_cmd, check=True)
+        data = merge_results(json_path, new_json_path)
+
+
+if __name__ == "__main__":
+    file_list = [
+        "Uniform_A_N250_I05_S1e3.json",
+        "Lognormal_B_N500_I05_S1e3.json"
+    ]
+
+    REL_PRECISION = 0.05
+
+    plans = plan_repetitions(file_list, rel_precision=REL_PRECISION)
+    print_plan(plans, REL_PRECISION)
+
+    # for json_file in file_list:
+    #     run_until_precision(json_file, rel_precision=REL_PRECISION, dry_run=True)
@@ -0,0 +1,186 @@
+import os
+import numbers
+import numpy as np
+from data_extraction import load_data, parse_filename
+
+# Tabella "long format" colonnare: dict colonna -> np.ndarray, una riga per
+# (file, run, modulo, metrica, valore). Le statistiche si calcolano con un
+# group-by vettoriale su qualsiasi combinazione di colonne.
+# Le colonne categoriche contengono codici interi; le etichette sono in
+# table["categories"][colonna], in ordine numerico o alfabetico.
+
+PARAM_COLUMNS = ("distribution", "opzione", "n_users", "interarrival", "size_rate")
+TABLE_COLUMNS = ("file",) + PARAM_COLUMNS + ("run", "module", "metric", "time", "value")
+CATEGORY_COLUMNS = ("file",) + PARAM_COLUMNS + ("module", "metric")
+
+def _sort_categories(labels, codes):
+    # Etichette ordinate numericamente se sono tutte numeri (n_users,
+    # interarrival, size_rate), altrimenti come stringhe; codici rimappati
+    categories = np.empty(len(labels), dtype=object)
+    categories[:] = list(labels)
+    if all(isinstance(label, numbers.Real) and not isinstance(label, bool) for label in categories):
+        order = np.argsort(categories.astype(float), kind="stable")
+    else:
+        order = np.argsort(categories.astype(str), kind="stable")
+    remap = np.empty(len(order), dtype=np.intp)
+    remap[order] = np.arange(len(order))
+    return categories[order], remap[codes]
+
+def flatten_results(data, file_name="", include_vectors=False):
+    params = parse_filename(file_name) if file_name else {}
+    runs, modules, metrics, times, values = [], [], [], [], []
+    module_codes, metric_codes = {}, {}
+
+    for run_index, (run_name, run_content) in enumerate(data.items()):
+        scalars = run_content.get("scalars", [])
+        if scalars:
+            runs.append(np.full(len(scalars), run_index))
+            modules.append(np.array([module_codes.setdefault(s.get("module", ""), len(module_codes)) for s in scalars], dtype=np.intp))
+            metrics.append(np.array([metric_codes.setdefault(s.get("name", ""), len(metric_codes)) for s in scalars], dtype=np.intp))
+            times.append(np.full(len(scalars), np.nan))
+            values.append(np.array([s.get("value") if s.get("value") is not None else 0 for s in scalars], dtype=float))
+
+        if not include_vectors:
+            continue
+        for vector in run_content.get("vectors", []):
+            # Modulo e metrica sono costanti per blocco: un solo codice ripetuto
+            t = np.asarray(vector.get("time", []), dtype=float)
+            n = len(t)
+            runs.append(np.full(n, run_index))
+            modules.append(np.full(n, module_codes.setdefault(vector.get("module", ""), len(module_codes)), dtype=np.intp))
+            metrics.append(np.full(n, metric_codes.setdefault(vector.get("name", ""), len(metric_codes)), dtype=np.intp))
+            times.append(t)
+            values.append(np.asarray(vector.get("value", []), dtype=float))
+
+    n_rows = sum(len(v) for v in values)
+    categories = {}
+    table = {
+        "run": np.concatenate(runs) if runs else np.array([], dtype=int),
+        "time": np.concatenate(times) if times else np.array([]),
+        "value": np.concatenate(values) if values else np.array([]),
+    }
+    categories["module"], table["module"] = _sort_categories(
+        module_codes, np.concatenate(modules) if modules else np.array([], dtype=np.intp))
+    categories["metric"], table["metric"] = _sort_categories(
+        metric_codes, np.concatenate(metrics) if metrics else np.array([], dtype=np.intp))
+    categories["file"], table["file"] = _sort_categories([os.path.basename(file_name)], np.zeros(n_rows, dtype=np.intp))
+    for column in PARAM_COLUMNS:
+        categories[column], table[column] = _sort_categories([params.get(column)], np.zeros(n_rows, dtype=np.intp))
+    table = {column: table[column] for column in TABLE_COLUMNS}
+    table["categories"] = categories
+    return table
+
+def concat_tables(tables):
+    table = {column: np.concatenate([t[column] for t in tables]) for column in TABLE_COLUMNS if column not in CATEGORY_COLUMNS}
+    categories = {}
+    for column in CATEGORY_COLUMNS:
+        # Unione delle categorie e rimappatura dei codici di ogni tabella
+        labels = {}
+        codes = []
+        for t in tables:
+            remap = np.array([labels.setdefault(label, len(labels)) for label in t["categories"][column]], dtype=np.intp)
+            codes.append(remap[t[column]])
+        categories[column], table[column] = _sort_categories(labels, np.concatenate(codes))
+    table = {column: table[column] for column in TABLE_COLUMNS}
+    table["categories"] = categories
+    return table
+
+def load_results_table(file_list, data_dir="data", include_vectors=False):
+    tables = []
+    for json_file in file_list:
+        data = load_data(os.path.join(data_dir, json_file))
+        tables.append(flatten_results(data, json_file, include_vectors))
+    return concat_tables(tables)
+
+def filter_table(table, **conditions):
+    categories = table["categories"]
+    mask = np.ones(len(table["value"]), dtype=bool)
+    for column, value in conditions.items():
+        if isinstance(value, (list, tuple, set)):
+            value = list(value)
+        else:
+            value = [value]
+        if column in categories:
+            # Il confronto si fa sulle etichette, poi si filtrano i codici
+            labels = categories[column]
+            allowed = [i for i, label in enumerate(labels) if any(label == v for v in value)]
+            mask &= np.isin(table[column], allowed)
+        else:
+            mask &= np.isin(table[column], value)
+    filtered = {column: table[column][mask] for column in TABLE_COLUMNS}
+    filtered["categories"] = categories
+    return filtered
+
+def _column_codes(table, column):
+    if column in table["categories"]:
+        labels = table["categories"][column]
+        return table[column], labels
+    labels, codes = np.unique(table[column], return_inverse=True)
+    return codes.ravel(), labels
+
+def _group_index(table, by):
+    # Codici interi per colonna combinati in un solo intero per riga, poi un
+    # np.unique monodimensionale (nessuna conversione a stringa)
+    codes, labels = zip(*(_column_codes(table, column) for column in by))
+    dims = tuple(max(len(l), 1) for l in labels)
+    keys, group = np.unique(np.ravel_multi_index(codes, dims), return_inverse=True)
+    key_codes = np.unravel_index(keys, dims)
+    group_columns = {column: labels[i][key_codes[i]] for i, column in enumerate(by)}
+    return group.ravel(), len(keys), group_columns
+
+def group_stats(table, by=("file", "module", "metric"), quantiles=(), z=1.96):
+    values = np.asarray(table["value"], dtype=float)
+    if len(values) == 0:
+        return {}
+    group, n_groups, result = _group_index(table, list(by))
+
+    n = np.bincount(group, minlength=n_groups)
+    total = np.bincount(group, weights=values, minlength=n_groups)
+    mean = total / n
+    # Varianza campionaria in due passate, come np.std(ddof=1)
+    sq_dev = np.bincount(group, weights=(values - mean[group]) ** 2, minlength=n_groups)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        std = np.where(n > 1, np.sqrt(sq_dev / np.maximum(n - 1, 1)), 0.0)
+    margin = z * std / np.sqrt(n)
+
+    result.update({
+        "n": n,
+        "mean": mean,
+        "margin": margin,
+        "ci_low": mean - margin,
+        "ci_high": mean + margin,
+        "total": total,
+    })
+
+    if quantiles:
+        order = np.lexsort((values, group))
+        sorted_values = values[order]
+        starts = np.concatenate(([0], np.cumsum(n)[:-1]))
+        for q in quantiles:
+            # Interpolazione lineare, come np.quantile
+            pos = q * (n - 1)
+            lo = np.floor(pos).astype(int)
+            hi = np.ceil(pos).astype(int)
+            v_lo = sorted_values[starts + lo]
+            v_hi = sorted_values[starts + hi]
+            result[f"q{q:g}"] = v_lo + (pos - lo) * (v_hi - v_lo)
+    return result
+
+def print_group_stats(stats, by=("file", "module", "metric")):
+    for i in range(len(stats.get("mean", []))):
+        label = ", ".join(str(stats[column][i]) for column in by)
+        print(f"{label}: mean = {stats['mean'][i]:.2f}, 95% CI = [{stats['ci_low'][i]:.2f}, {stats['ci_high'][i]:.2f}], "
+              f"total = {stats['total'][i]:.2f}")
+
+
+if __name__ == "__main__":
+    file_list = [
+        "Uniform_A_N250_I05_S1e3.json",
+        "Uniform_B_N250_I05_S1e3.json"
+    ]
+
+    table = load_results_table(file_list)
+    counts = filter_table(table, metric=["dropped:count", "forwarded:count"])
+
+    by = ("file", "metric")
+    print_group_stats(group_stats(counts, by=by), by=by)
@@ -0,0 +1,120 @@
+import numpy as np
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, contextmanager
+from multiprocessing import shared_memory
+
+# Layout: due blocchi float64 (tempi e valori) con tutte le run concatenate.
+# Il manifest indica, per ogni (modulo, vettore), gli offset di inizio/fine
+# di ciascuna run all'interno dei blocchi.
+
+def _create_block(n_items):
+    # SharedMemory non accetta size=0
+    return shared_memory.SharedMemory(create=True, size=max(n_items, 1) * 8)
+
+def _attach_block(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: i worker del pool condividono il resource tracker del
+        # processo principale, quindi la registrazione ripetuta e' innocua e il
+        # blocco viene rimosso solo da chi lo ha creato
+        return shared_memory.SharedMemory(name=name)
+
+def _release_block(shm, unlink):
+    try:
+        shm.close()
+    except BufferError:
+        # Esistono ancora viste sul blocco: la memoria viene liberata comunque
+        # quando le viste vengono rilasciate
+        pass
+    if unlink:
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+def _views(manifest, times_buf, values_buf):
+    times_all = np.ndarray((manifest["length"],), dtype=np.float64, buffer=times_buf)
+    values_all = np.ndarray((manifest["length"],), dtype=np.float64, buffer=values_buf)
+    vectors = defaultdict(lambda: defaultdict(list))
+    for entry in manifest["entries"]:
+        offsets = entry["offsets"]
+        runs = vectors[entry["module"]][entry["name"]]
+        for start, end in zip(offsets[:-1], offsets[1:]):
+            runs.append((times_all[start:end], values_all[start:end]))
+    return vectors
+
+@contextmanager
+def shared_vectors(vectors, keys=None):
+    # Copia i vettori estratti in memoria condivisa e restituisce il manifest.
+    # I blocchi vengono sempre rimossi all'uscita, anche se un worker fallisce;
+    # se crasha il processo principale ci pensa il resource tracker.
+    entries = []
+    total = 0
+    for module, metrics in vectors.items():
+        for name, series_list in metrics.items():
+            if keys is not None and name not in keys:
+                continue
+            offsets = [total]
+            for times, _ in series_list:
+                total += len(times)
+                offsets.append(total)
+            entries.append({"module": module, "name": name, "offsets": offsets})
+
+    times_shm = _create_block(total)
+    values_shm = None
+    try:
+        values_shm = _create_block(total)
+        manifest = {
+            "times_block": times_shm.name,
+            "values_block": values_shm.name,
+            "length": total,
+            "entries": entries,
+        }
+        times_all = np.ndarray((total,), dtype=np.float64, buffer=times_shm.buf)
+        values_all = np.ndarray((total,), dtype=np.float64, buffer=values_shm.buf)
+        for entry in entries:
+            offsets = entry["offsets"]
+            series_list = vectors[entry["module"]][entry["name"]]
+            for (times, values), start, end in zip(series_list, offsets[:-1], offsets[1:]):
+                times_all[start:end] = times
+                values_all[start:end] = values
+        del times_all, values_all
+        yield manifest
+    finally:
+        _release_block(times_shm, unlink=True)
+        if values_shm is not None:
+            _release_block(values_shm, unlink=True)
+
+@contextmanager
+def attached_vectors(manifest):
+    # Lato worker: viste NumPy (senza copie) con la stessa struttura di
+    # extract_statistics. Le viste non devono sopravvivere al blocco with.
+    times_shm = _attach_block(manifest["times_block"])
+    try:
+        values_shm = _attach_block(manifest["values_block"])
+    except Exception:
+        _release_block(times_shm, unlink=False)
+        raise
+    vectors = _views(manifest, times_shm.buf, values_shm.buf)
+    try:
+        yield vectors
+    finally:
+        vectors.clear()
+        del vectors
+        _release_block(times_shm, unlink=False)
+        _release_block(values_shm, unlink=False)
+
+def _aggregate_worker(manifest, key, convert_to_ms):
+    from multi_file_graph import aggregate_mean_time_series
+    with attached_vectors(manifest) as vectors:
+        return aggregate_mean_time_series(vectors, key, convert_to_ms=convert_to_ms)
+
+def parallel_aggregate_mean_time_series(vectors_list, key, convert_to_ms=False, max_workers=None):
+    # Un job per file: ai worker passa solo il manifest, non i dati
+    with ExitStack() as stack:
+        manifests = [stack.enter_context(shared_vectors(v, keys=[key])) for v in vectors_list]
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_aggregate_worker, m, key, convert_to_ms) for m in manifests]
+            return [f.result() for f in futures]
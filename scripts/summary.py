@@ -0,0 +1,125 @@
+import os
+import csv
+import sys
+import json
+import argparse
+from data_extraction import *
+
+# Entry point solo statistiche: nessun import di matplotlib, utilizzabile
+# da cron su molti file in una sola invocazione.
+
+VECTOR_STATS = (
+    ("responseTime:vector", "Response Time", True),
+    ("queueLength:vector", "Queue Length", False),
+)
+SCALAR_STATS = (
+    ("dropped:count", "Dropped Packets"),
+    ("forwarded:count", "Forwarded Packets"),
+)
+
+SUMMARY_FIELDS = ["file", "metric", "module", "n", "mean", "margin", "ci_low", "ci_high"]
+
+def print_vector_statistics(vectors, key, label, convert_to_ms=False):
+    print(f"\n=== {label} Statistics ===")
+    data = flatten_vector_data(vectors, key, convert_to_ms=convert_to_ms)
+    if not data:
+        print(f"  Nessun dato disponibile per il vettore '{key}'.")
+        return
+    for module, values in data.items():
+        mean, margin, ci_low, ci_high = compute_average_and_ci(values)
+        print(f"{module}: mean = {mean:.2f}, 95% CI = [{ci_low:.2f}, {ci_high:.2f}]")
+    print()
+
+def print_scalar_statistics(scalars, key, label):
+    print(f"\n=== {label} Statistics ===")
+    data = compute_averages_with_ci(scalars, key)
+    if not data:
+        print(f"  Nessun dato disponibile per lo scalare '{key}'.")
+        return
+    for module, stats in data.items():
+        mean = stats["mean"]
+        margin = stats["margin"]
+        ci_low = stats["ci_low"]
+        ci_high = stats["ci_high"]
+        print(f"{module}: mean = {mean:.2f}, 95% CI = [{ci_low:.2f}, {ci_high:.2f}]")
+    print()
+
+def print_total_packets(scalars, key, label):
+    total = compute_totals(scalars, key)
+    print(f"Total {label}: {total}\n")
+
+def print_all_statistics(scalars, vectors):
+    print_vector_statistics(vectors, key="responseTime:vector", label="Response Time", convert_to_ms=True)
+    print_vector_statistics(vectors, key="queueLength:vector", label="Queue Length", convert_to_ms=False)
+    print_scalar_statistics(scalars, key="dropped:count", label="Dropped Packets")
+    print_scalar_statistics(scalars, key="forwarded:count", label="Forwarded Packets")
+    print_total_packets(scalars, key="dropped:count", label="Dropped Packets")
+    print_total_packets(scalars, key="forwarded:count", label="Forwarded Packets")
+
+
+def summarize_statistics(scalars, vectors, file_name=""):
+    rows = []
+    for key, _, convert_to_ms in VECTOR_STATS:
+        data = flatten_vector_data(vectors, key, convert_to_ms=convert_to_ms)
+        for module, values in data.items():
+            mean, margin, ci_low, ci_high = compute_average_and_ci(values)
+            rows.append([file_name, key, module, len(values), mean, margin, ci_low, ci_high])
+    for key, _ in SCALAR_STATS:
+        for module, stats in compute_averages_with_ci(scalars, key).items():
+            n = len(scalars[module][key])
+            rows.append([file_name, key, module, n, stats["mean"], stats["margin"], stats["ci_low"], stats["ci_high"]])
+        # Totale su tutte le base station e ripetizioni
+        total = compute_totals(scalars, key)
+        rows.append([file_name, key, "total", None, total, None, None, None])
+    return [dict(zip(SUMMARY_FIELDS, _to_builtin(row))) for row in rows]
+
+def _to_builtin(row):
+    return [v.item() if hasattr(v, "item") else v for v in row]
+
+def summarize_files(file_list, subsample_rate=None, subsample_number=None, print_stats=False, backend="json"):
+    rows = []
+    for json_path in file_list:
+        data = load_data(json_path, backend=backend)
+        scalars, vectors = extract_statistics(data, subsample_rate, subsample_number)
+        file_name = os.path.basename(json_path)
+        if print_stats:
+            print(f"\n##### {file_name} #####")
+            print_all_statistics(scalars, vectors)
+        rows.extend(summarize_statistics(scalars, vectors, file_name))
+    return rows
+
+def export_summary(rows, fmt, out):
+    if fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    elif fmt == "json":
+        json.dump(rows, out, indent=2)
+        out.write("\n")
+    else:
+        raise ValueError("Formato non valido. Usa 'csv' o 'json'.")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Statistiche di response time, queue length, dropped e forwarded senza grafici.")
+    parser.add_argument("files", nargs="+", help="file JSON esportati da OMNeT++")
+    parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    parser.add_argument("--output", "-o", help="file di output (default: stdout)")
+    parser.add_argument("--subsample-number", type=int, default=None)
+    parser.add_argument("--subsample-rate", type=float, default=None)
+    parser.add_argument("--backend", choices=JSON_BACKENDS, default="json", help="backend di decodifica JSON")
+    args = parser.parse_args(argv)
+
+    if args.format == "text":
+        summarize_files(args.files, args.subsample_rate, args.subsample_number, print_stats=True, backend=args.backend)
+        return
+
+    rows = summarize_files(args.files, args.subsample_rate, args.subsample_number, backend=args.backend)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8", newline="") as f:
+            export_summary(rows, args.format, f)
+    else:
+        export_summary(rows, args.format, sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
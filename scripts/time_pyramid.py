@@ -0,0 +1,131 @@
+import os
+import numpy as np
+from collections import defaultdict
+from data_extraction import load_data, extract_statistics
+
+# Piramide multi-risoluzione di un vettore: il livello 0 sono i campioni
+# originali ordinati per tempo, ogni livello successivo raggruppa `factor`
+# elementi del precedente conservando min/media/max e numero di campioni.
+# Una query con `points` usa il livello piu' grossolano che ha almeno `points`
+# campioni nella finestra, quindi fino a circa factor * points (meno solo se
+# la finestra contiene meno di `points` campioni originali).
+
+PYRAMID_KEYS = ("responseTime:vector", "queueLength:vector")
+
+def _window_slice(times, t_min, t_max, pad=1):
+    # Ricerca binaria; `pad` campioni fuori finestra per interpolare ai bordi
+    start = np.searchsorted(times, t_min, side="left")
+    end = np.searchsorted(times, t_max, side="right")
+    return slice(max(start - pad, 0), min(end + pad, len(times)))
+
+def build_pyramid(times, values, factor=4, min_size=16):
+    if factor < 2:
+        raise ValueError("factor deve essere almeno 2.")
+    times = np.asarray(times, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if len(times) > 1 and np.any(np.diff(times) < 0):
+        order = np.argsort(times, kind="stable")
+        times = times[order]
+        values = values[order]
+
+    level = {
+        "times": times,
+        "min": values,
+        "mean": values,
+        "max": values,
+        "count": np.ones(len(times)),
+    }
+    levels = [level]
+    while len(level["times"]) > min_size:
+        starts = np.arange(0, len(level["times"]), factor)
+        count = np.add.reduceat(level["count"], starts)
+        level = {
+            "times": np.add.reduceat(level["times"] * level["count"], starts) / count,
+            "min": np.minimum.reduceat(level["min"], starts),
+            "mean": np.add.reduceat(level["mean"] * level["count"], starts) / count,
+            "max": np.maximum.reduceat(level["max"], starts),
+            "count": count,
+        }
+        levels.append(level)
+    return levels
+
+def query_pyramid(levels, x_limit=None, points=None):
+    # Sceglie il livello piu' grossolano che ha almeno `points` campioni nella
+    # finestra (senza `points` usa i dati originali)
+    chosen = levels[0]
+    if points is not None:
+        for level in reversed(levels):
+            if x_limit is None:
+                n_in_window = len(level["times"])
+            else:
+                s = _window_slice(level["times"], x_limit[0], x_limit[1], pad=0)
+                n_in_window = s.stop - s.start
+            if n_in_window >= points:
+                chosen = level
+                break
+
+    if x_limit is None:
+        s = slice(None)
+    else:
+        s = _window_slice(chosen["times"], x_limit[0], x_limit[1])
+    return {name: arr[s] for name, arr in chosen.items()}
+
+def build_vector_pyramids(vectors, keys=None, factor=4, min_size=16):
+    pyramids = defaultdict(lambda: defaultdict(list))
+    for module, metrics in vectors.items():
+        for name, series_list in metrics.items():
+            if keys is not None and name not in keys:
+                continue
+            for times, values in series_list:
+                pyramids[module][name].append(build_pyramid(times, values, factor, min_size))
+    return pyramids
+
+def query_vector_pyramids(pyramids, x_limit=None, points=None, keys=None):
+    # Stessa struttura di extract_statistics, pronta per le funzioni di
+    # aggregazione; i valori sono le medie dei bucket del livello scelto
+    vectors = defaultdict(lambda: defaultdict(list))
+    for module, metrics in pyramids.items():
+        for name, levels_list in metrics.items():
+            if keys is not None and name not in keys:
+                continue
+            for levels in levels_list:
+                q = query_pyramid(levels, x_limit, points)
+                vectors[module][name].append((q["times"], q["mean"]))
+    return vectors
+
+def window_vectors(vectors, x_limit, keys=None):
+    # Finestra sui dati originali (gia' ordinati per tempo da OMNeT++), senza
+    # piramide: le aggregazioni sui vettori restituiti coincidono con quelle
+    # sui dati completi dentro x_limit
+    windowed = defaultdict(lambda: defaultdict(list))
+    for module, metrics in vectors.items():
+        for name, series_list in metrics.items():
+            if keys is not None and name not in keys:
+                continue
+            for times, values in series_list:
+                times = np.asarray(times, dtype=float)
+                values = np.asarray(values, dtype=float)
+                s = _window_slice(times, x_limit[0], x_limit[1])
+                windowed[module][name].append((times[s], values[s]))
+    return windowed
+
+# Dati estratti e piramidi tenuti in memoria per file: un nuovo zoom sullo
+# stesso file (stessi parametri) fa solo la ricerca binaria sui livelli
+_STORE = {}
+
+def load_with_pyramids(json_path, subsample_rate=None, subsample_number=None, keys=PYRAMID_KEYS, factor=4, min_size=16):
+    path = os.path.abspath(json_path)
+    signature = (os.path.getmtime(path), subsample_rate, subsample_number, tuple(keys), factor, min_size)
+    stored = _STORE.get(path)
+    if stored is None or stored[0] != signature:
+        scalars, vectors = extract_statistics(load_data(path), subsample_rate, subsample_number)
+        stored = (signature, (scalars, vectors, build_vector_pyramids(vectors, keys, factor, min_size)))
+        _STORE[path] = stored
+    return stored[1]
+
+def select_window(vectors, x_limit, keys=None, pyramids=None, points=None):
+    # Con le piramidi gia' costruite e `points` si legge il livello adatto alla
+    # finestra, altrimenti i campioni originali
+    if pyramids is None or points is None:
+        return window_vectors(vectors, x_limit, keys)
+    return query_vector_pyramids(pyramids, x_limit, points, keys)